@@ -0,0 +1,95 @@
+"""Бенчмарк фільтрів головної сторінки за кількістю страв.
+
+Для кожного розміру створює тимчасову SQLite-базу, заповнює її випадковими
+стравами та вимірює запити з діапазонами, пошуком і виключенням алергенів.
+Запуск: python bench_filters.py [1000 10000 100000]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import models
+from routers.search_controler import RANKED_LIMIT, build_dishes_query
+
+INGREDIENT_COUNT = 200
+ALLERGEN_INGREDIENTS = 10
+REPEATS = 20
+
+CASES = {
+    "time_max=30, calories_max=400, top": (None, {"time": (None, 30), "calories": (None, 400)}, True),
+    "servings_min=6, time_max=20, top": (None, {"servings": (6, None), "time": (None, 20)}, True),
+    "q + calories 300..350": ("1", {"calories": (300, 350)}, False),
+    "time_max=10 + алергени": (None, {"time": (None, 10)}, False),
+}
+
+
+def populate(engine, dish_count: int):
+    rnd = random.Random(dish_count)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.Ingredient), [
+            {"id": i, "name": f"Інгредієнт {i}", "allergen_tags": "Глютен" if i <= ALLERGEN_INGREDIENTS else ""}
+            for i in range(1, INGREDIENT_COUNT + 1)
+        ])
+        conn.execute(insert(models.Dish), [
+            {
+                "id": i, "name": f"Страва {i}", "ingredients": "", "steps": "",
+                "calories": rnd.randint(100, 1200), "cooking_time": rnd.randint(5, 180),
+                "servings": rnd.randint(1, 8), "rating": rnd.uniform(0, 10),
+                "bayes_score": rnd.uniform(0, 10), "trending_score": rnd.uniform(0, 5),
+            }
+            for i in range(1, dish_count + 1)
+        ])
+        conn.execute(insert(models.DishIngredient), [
+            {"dish_id": i, "ingredient_id": ing_id, "is_optional": int(n == 0)}
+            for i in range(1, dish_count + 1)
+            for n, ing_id in enumerate(rnd.sample(range(1, INGREDIENT_COUNT + 1), 6))
+        ])
+        conn.execute(text("ANALYZE"))
+
+
+def run_case(db, q, ranges, ranked, excluded):
+    query = build_dishes_query(db, q, ranges, excluded)
+    if ranked:
+        query = query.order_by(models.Dish.bayes_score.desc(), models.Dish.id).limit(RANKED_LIMIT)
+    else:
+        query = query.order_by(models.Dish.rating.desc(), models.Dish.id)
+    return query
+
+
+def main(sizes):
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            populate(engine, size)
+            db = sessionmaker(bind=engine)()
+            excluded = list(range(1, ALLERGEN_INGREDIENTS + 1))
+            print(f"\nСтрав: {size}")
+            for name, (q, ranges, ranked) in CASES.items():
+                query = run_case(db, q, ranges, ranked, excluded if "алергени" in name else None)
+                timings = []
+                for _ in range(REPEATS):
+                    t0 = time.perf_counter()
+                    rows = query.all()
+                    timings.append(time.perf_counter() - t0)
+                    db.expunge_all()
+                print(f"  {name:<36} рядків {len(rows):>5}  медіана {statistics.median(timings) * 1000:7.2f} мс")
+            plan_query = run_case(db, None, CASES["time_max=30, calories_max=400, top"][1], True, excluded)
+            compiled = plan_query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+            with engine.connect() as conn:
+                plan = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).fetchall()
+            print("  План:", "; ".join(row[-1] for row in plan))
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
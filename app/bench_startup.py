@@ -0,0 +1,42 @@
+"""Вимірює час від імпорту застосунку до першої відповіді.
+
+Кожен запуск — окремий процес, тож імпорти та кеш шаблонів у пам'яті холодні.
+Запуск: DATABASE_URL=sqlite:///database.db python bench_startup.py [кількість]
+"""
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+from main import app
+t1 = time.perf_counter()
+with TestClient(app) as client:
+    client.get("/")
+t2 = time.perf_counter()
+print(f"{t1 - t0:.4f} {t2 - t0:.4f}")
+"""
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", CHILD],
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def main(runs: int):
+    results = [run_once() for _ in range(runs)]
+    imports = [r[0] for r in results]
+    totals = [r[1] for r in results]
+    print(f"Запусків: {runs}")
+    print(f"Імпорт:                  медіана {statistics.median(imports) * 1000:.1f} мс")
+    print(f"Імпорт -> перша відповідь: медіана {statistics.median(totals) * 1000:.1f} мс, "
+          f"макс {max(totals) * 1000:.1f} мс")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,75 @@
+"""Запускає кілька процесів-воркерів з локальним транспортом і перевіряє,
+що подію, опубліковану в одному, отримують усі інші.
+
+Запуск: python check_invalidation_bus.py [кількість воркерів]
+"""
+import multiprocessing
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from invalidation import CATALOG_CHANGED, DISH_CHANGED, USER_CHANGED, InvalidationBus, UnixSocketTransport
+
+EVENTS = [(DISH_CHANGED, 1), (USER_CHANGED, 7), (CATALOG_CHANGED, None)]
+
+
+def worker(directory, ready, results, stop):
+    bus = InvalidationBus(UnixSocketTransport(directory))
+    for kind in (DISH_CHANGED, USER_CHANGED, CATALOG_CHANGED):
+        bus.subscribe(kind, lambda event: results.put((os.getpid(), event.kind, event.id, time.perf_counter())))
+    bus.start()
+    ready.release()
+    stop.wait()
+    bus.stop()
+
+
+def main(workers: int):
+    ctx = multiprocessing.get_context("spawn")
+    directory = tempfile.mkdtemp(prefix="recipes-bus-")
+    ready = ctx.Semaphore(0)
+    results = ctx.Queue()
+    stop = ctx.Event()
+    procs = [ctx.Process(target=worker, args=(directory, ready, results, stop), daemon=True) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.acquire()
+
+    publisher = InvalidationBus(UnixSocketTransport(directory))
+    sent_at = time.perf_counter()
+    for kind, obj_id in EVENTS:
+        publisher.publish(kind, obj_id)
+
+    received = {}
+    expected = workers * len(EVENTS)
+    latencies = []
+    try:
+        while len(latencies) < expected:
+            pid, kind, obj_id, at = results.get(timeout=5)
+            received.setdefault(pid, []).append((kind, obj_id))
+            latencies.append(at - sent_at)
+    except queue.Empty:
+        pass
+    finally:
+        stop.set()
+        for p in procs:
+            p.join(timeout=5)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    ok = len(received) == workers and all(
+        sorted(events, key=str) == sorted(EVENTS, key=str) for events in received.values()
+    )
+    print(f"Воркерів: {workers}, подій отримано: {len(latencies)}/{expected}")
+    if latencies:
+        print(f"Максимальна затримка доставки: {max(latencies) * 1000:.2f} мс")
+    print("OK" if ok else "ПОМИЛКА")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 4))
@@ -0,0 +1,146 @@
+"""Потоковий експорт каталогу та відгуків у JSONL/CSV з постійним споживанням пам'яті.
+
+Запуск: python export.py dishes|reviews [--format jsonl|csv] [--since-id N] [--since 2024-01-01T00:00:00]
+--since (за created_at) доступний лише для reviews.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from itertools import chain, groupby
+
+from sqlalchemy import select
+
+from database import engine
+import models
+
+STREAM_CHUNK_SIZE = 1000
+FORMATS = ("jsonl", "csv")
+MEDIA_TYPES = {"jsonl": "application/x-ndjson", "csv": "text/csv"}
+
+DISH_FIELDS = [
+    "id", "name", "image", "calories", "cooking_time", "servings", "rating", "review_count",
+    "ingredients", "optional_ingredients", "steps", "ingredient_links",
+]
+REVIEW_FIELDS = ["id", "dish_id", "user_id", "rating", "text", "created_at"]
+
+
+def _stream(conn, stmt):
+    # Курсор читається весь час, поки клієнт качає файл, — таймаут запиту тут не діє.
+    return conn.execution_options(
+        stream_results=True, yield_per=STREAM_CHUNK_SIZE, sql_watchdog_timeout=None,
+    ).execute(stmt)
+
+
+def iter_dishes(since_id: int = 0):
+    """Страви з інгредієнтами: один JOIN через серверний курсор, групування по id."""
+    dish, di, ing = models.Dish.__table__, models.DishIngredient.__table__, models.Ingredient.__table__
+    stmt = (
+        select(
+            dish.c.id, dish.c.name, dish.c.image, dish.c.calories, dish.c.cooking_time,
+            dish.c.servings, dish.c.rating, dish.c.review_count,
+            dish.c.ingredients, dish.c.optional_ingredients, dish.c.steps,
+            ing.c.id.label("ingredient_id"), ing.c.name.label("ingredient_name"),
+            ing.c.allergen_tags, di.c.is_optional,
+        )
+        .select_from(dish.outerjoin(di, di.c.dish_id == dish.c.id).outerjoin(ing, ing.c.id == di.c.ingredient_id))
+        .where(dish.c.id > since_id)
+        .order_by(dish.c.id, ing.c.id)
+    )
+    with engine.connect() as conn:
+        for _, rows in groupby(_stream(conn, stmt), key=lambda r: r.id):
+            rows = list(rows)
+            first = rows[0]
+            record = {field: getattr(first, field) for field in DISH_FIELDS[:-1]}
+            record["ingredient_links"] = [
+                {
+                    "id": r.ingredient_id,
+                    "name": r.ingredient_name,
+                    "optional": bool(r.is_optional),
+                    "allergen_tags": r.allergen_tags or "",
+                }
+                for r in rows if r.ingredient_id is not None
+            ]
+            yield record
+
+
+def iter_reviews(since_id: int = 0, since: datetime = None):
+    reviews = models.Review.__table__
+    stmt = select(*(reviews.c[f] for f in REVIEW_FIELDS)).where(reviews.c.id > since_id)
+    if since is not None:
+        stmt = stmt.where(reviews.c.created_at >= since)
+    stmt = stmt.order_by(reviews.c.id)
+    with engine.connect() as conn:
+        for row in _stream(conn, stmt):
+            yield dict(row._mapping)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _batched(lines):
+    """Склеює рядки по STREAM_CHUNK_SIZE, щоб не віддавати HTTP-чанк на кожен запис."""
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= STREAM_CHUNK_SIZE:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+
+
+def to_jsonl(records):
+    return _batched(json.dumps(record, ensure_ascii=False, default=_json_default) + "\n" for record in records)
+
+
+def to_csv(records, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def rows():
+        for row in chain([fields], ([_csv_value(record[f]) for f in fields] for record in records)):
+            writer.writerow(row)
+            line = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            yield line
+
+    return _batched(rows())
+
+
+def export_lines(kind: str, fmt: str = "jsonl", since_id: int = 0, since: datetime = None):
+    """Страви відновлюються лише за since_id; since (за часом) є тільки у відгуків."""
+    if kind == "dishes" and since is not None:
+        raise ValueError("since підтримується лише для reviews, для dishes використовуйте since_id")
+    if kind == "dishes":
+        records, fields = iter_dishes(since_id), DISH_FIELDS
+    else:
+        records, fields = iter_reviews(since_id, since), REVIEW_FIELDS
+    return to_csv(records, fields) if fmt == "csv" else to_jsonl(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("kind", choices=["dishes", "reviews"])
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--since-id", type=int, default=0)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    if args.kind == "dishes" and args.since is not None:
+        parser.error("--since підтримується лише для reviews, для dishes використовуйте --since-id")
+    for line in export_lines(args.kind, args.format, args.since_id, args.since):
+        sys.stdout.write(line)
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import select
+import socket
+import tempfile
+import threading
+import uuid
+from collections import defaultdict, namedtuple
+
+from sqlalchemy import text
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+DISH_CHANGED = "dish"
+USER_CHANGED = "user"
+CATALOG_CHANGED = "catalog"
+
+Event = namedtuple("Event", ["kind", "id"])
+
+BUS_DIR = os.environ.get("CACHE_BUS_DIR")
+PG_CHANNEL = "recipes_cache"
+PG_RECONNECT_MIN_DELAY = 0.5
+PG_RECONNECT_MAX_DELAY = 30.0
+
+
+class UnixSocketTransport:
+    """Локальний транспорт: кожен воркер слухає власний датаграм-сокет у спільній теці."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = None
+        self._sock = None
+        self._stopped = threading.Event()
+
+    def start(self, on_message, on_reconnect=None):
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.settimeout(0.5)
+        self._stopped.clear()
+        threading.Thread(target=self._listen, args=(on_message,), daemon=True).start()
+
+    def _listen(self, on_message):
+        while not self._stopped.is_set():
+            try:
+                data = self._sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            on_message(data.decode())
+
+    def send(self, payload: str):
+        if not os.path.isdir(self.directory):
+            return
+        data = payload.encode()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as out:
+            # Неблокуючий сокет: завислий воркер із заповненою чергою не має зупиняти запит.
+            out.setblocking(False)
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if not name.endswith(".sock") or path == self.path:
+                    continue
+                try:
+                    out.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Воркер завершився, не прибравши сокет.
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                except BlockingIOError:
+                    logger.warning("Черга воркера %s переповнена, подію відкинуто", name)
+                except OSError:
+                    logger.exception("Не вдалося надіслати подію воркеру %s", name)
+
+    def stop(self):
+        self._stopped.set()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class PostgresTransport:
+    """Транспорт через LISTEN/NOTIFY на окремому з'єднанні поза пулом."""
+
+    def __init__(self, engine, channel: str = PG_CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self._conn = None
+        self._stopped = threading.Event()
+
+    def _connect(self):
+        raw = self.engine.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {self.channel}")
+        return conn
+
+    def start(self, on_message, on_reconnect=None):
+        self._conn = self._connect()
+        self._stopped.clear()
+        threading.Thread(target=self._listen, args=(on_message, on_reconnect), daemon=True).start()
+
+    def _close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _listen(self, on_message, on_reconnect):
+        delay = PG_RECONNECT_MIN_DELAY
+        while not self._stopped.is_set():
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                    delay = PG_RECONNECT_MIN_DELAY
+                    logger.warning("Знову слухаємо %s", self.channel)
+                    if on_reconnect is not None:
+                        on_reconnect()
+                if not select.select([self._conn], [], [], 0.5)[0]:
+                    continue
+                self._conn.poll()
+            except Exception:
+                if self._stopped.is_set():
+                    break
+                logger.exception("Помилка прослуховування %s, перепідключення через %.1f с", self.channel, delay)
+                self._close()
+                self._stopped.wait(delay)
+                delay = min(delay * 2, PG_RECONNECT_MAX_DELAY)
+                continue
+            while self._conn.notifies:
+                on_message(self._conn.notifies.pop(0).payload)
+
+    def send(self, payload: str):
+        with self.engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+
+    def stop(self):
+        self._stopped.set()
+        self._close()
+
+
+class InvalidationBus:
+    """Розсилає події інвалідації кешу всім воркерам.
+
+    Локальні підписники отримують подію одразу, інші воркери — через транспорт.
+    Події з інших воркерів ставляться в чергу, а колбеки викликає окремий
+    потік, тож повільний підписник не заважає транспорту читати сокет.
+    """
+
+    def __init__(self, transport=None):
+        self.transport = transport
+        self.sender = uuid.uuid4().hex
+        self._subscribers = defaultdict(list)
+        self._queue = queue.Queue()
+
+    def subscribe(self, kind: str, callback):
+        self._subscribers[kind].append(callback)
+
+    def publish(self, kind: str, obj_id: int = None):
+        event = Event(kind, obj_id)
+        self._dispatch(event)
+        if self.transport is None:
+            return
+        payload = json.dumps({"sender": self.sender, "kind": kind, "id": obj_id})
+        try:
+            self.transport.send(payload)
+        except Exception:
+            logger.exception("Не вдалося розіслати подію %s", event)
+
+    def start(self):
+        if self.transport is None:
+            return
+        threading.Thread(target=self._drain, daemon=True).start()
+        self.transport.start(self._on_message, self._on_reconnect)
+
+    def stop(self):
+        if self.transport is not None:
+            self.transport.stop()
+            self._queue.put(None)
+
+    def _on_message(self, raw: str):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+        if message.get("sender") == self.sender:
+            return
+        self._queue.put(Event(message["kind"], message.get("id")))
+
+    def _on_reconnect(self):
+        # Поки з'єднання не було, події могли загубитися — скидаємо все локально.
+        self._queue.put(Event(CATALOG_CHANGED, None))
+
+    def _drain(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                break
+            self._dispatch(event)
+
+    def _dispatch(self, event: Event):
+        for callback in list(self._subscribers.get(event.kind, ())):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("Підписник впав на події %s", event)
+
+
+def default_bus_dir(engine) -> str:
+    """Окрема тека для кожної бази, щоб різні розгортання на одному хості не чули одне одного."""
+    url = engine.url.render_as_string(hide_password=False)
+    digest = hashlib.sha1(url.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"recipes-cache-bus-{digest}")
+
+
+def create_transport(engine):
+    kind = os.environ.get("CACHE_BUS_TRANSPORT")
+    if kind is None:
+        kind = "postgres" if engine.dialect.name == "postgresql" else "local"
+    if kind == "postgres":
+        return PostgresTransport(engine)
+    if kind == "local":
+        return UnixSocketTransport(BUS_DIR or default_bus_dir(engine))
+    return None
+
+
+bus = InvalidationBus(create_transport(engine))
@@ -1,20 +1,35 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 
 from database import engine
 import models
+from invalidation import bus
+import sql_watchdog
 
-from routers import profile_controler, search_controler, comments_controler
+from routers import profile_controler, search_controler, comments_controler, meal_plan_controler, export_controler
 
-app = FastAPI()
 
-app.add_middleware(SessionMiddleware, secret_key="change-this-secret")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    models.Base.metadata.create_all(bind=engine)
+    bus.start()
+    yield
+    bus.stop()
+
 
-models.Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(SessionMiddleware, secret_key="change-this-secret")
+if sql_watchdog.ENABLED:
+    app.add_middleware(sql_watchdog.WatchdogMiddleware)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 app.include_router(search_controler.router)
 app.include_router(comments_controler.router)
 app.include_router(profile_controler.router)
+app.include_router(meal_plan_controler.router)
+app.include_router(export_controler.router)
@@ -0,0 +1,16 @@
+from sqlalchemy import text
+
+from database import engine
+
+INDEXES = {
+    "ix_dishes_calories_cooking_time": "dishes (calories, cooking_time)",
+    "ix_dishes_cooking_time_calories": "dishes (cooking_time, calories)",
+    "ix_dishes_servings_cooking_time": "dishes (servings, cooking_time)",
+    "ix_dish_ingredients_dish_ingredient": "dish_ingredients (dish_id, ingredient_id, is_optional)",
+}
+
+with engine.begin() as conn:
+    for name, target in INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {target}"))
+
+print("Done")
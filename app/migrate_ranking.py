@@ -0,0 +1,27 @@
+from sqlalchemy import inspect, text
+
+from database import SessionLocal, engine
+import ranking
+
+COLUMNS = {
+    "review_count": "INTEGER NOT NULL DEFAULT 0",
+    "rating_sum": "INTEGER NOT NULL DEFAULT 0",
+    "bayes_score": "FLOAT NOT NULL DEFAULT 0",
+    "trending_score": "FLOAT NOT NULL DEFAULT 0",
+    "trending_updated_at": "TIMESTAMP",
+}
+
+existing = {c["name"] for c in inspect(engine).get_columns("dishes")}
+
+with engine.begin() as conn:
+    for name, ddl in COLUMNS.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE dishes ADD COLUMN {name} {ddl}"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_dishes_bayes_score ON dishes (bayes_score)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_dishes_trending_score ON dishes (trending_score)"))
+
+db = SessionLocal()
+ranking.rebuild(db)
+db.close()
+
+print("Done")
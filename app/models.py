@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -32,6 +32,10 @@ class DishIngredient(Base):
     dish = relationship("Dish", back_populates="dish_ingredients")
     ingredient = relationship("Ingredient", back_populates="dish_ingredients")
 
+    __table_args__ = (
+        Index("ix_dish_ingredients_dish_ingredient", "dish_id", "ingredient_id", "is_optional"),
+    )
+
 
 class Dish(Base):
     __tablename__ = "dishes"
@@ -45,9 +49,20 @@ class Dish(Base):
     cooking_time = Column(Integer, nullable=False)
     servings = Column(Integer, default=4)
     rating = Column(Float, default=0.0)
+    review_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    bayes_score = Column(Float, default=0.0, nullable=False, index=True)
+    trending_score = Column(Float, default=0.0, nullable=False, index=True)
+    trending_updated_at = Column(DateTime, nullable=True)
     reviews = relationship("Review", back_populates="dish")
     dish_ingredients = relationship("DishIngredient", back_populates="dish")
 
+    __table_args__ = (
+        Index("ix_dishes_calories_cooking_time", "calories", "cooking_time"),
+        Index("ix_dishes_cooking_time_calories", "cooking_time", "calories"),
+        Index("ix_dishes_servings_cooking_time", "servings", "cooking_time"),
+    )
+
 
 class Review(Base):
     __tablename__ = "reviews"
@@ -0,0 +1,8 @@
+from templating import TEMPLATE_CACHE_DIR, precompile_templates, templates
+
+if __name__ == "__main__":
+    count = precompile_templates()
+    if templates.env.bytecode_cache.enabled:
+        print(f"Скомпільовано шаблонів: {count} -> {TEMPLATE_CACHE_DIR}")
+    else:
+        print(f"Тека {TEMPLATE_CACHE_DIR} недоступна для запису, кеш не збережено.")
@@ -0,0 +1,130 @@
+import os
+from datetime import datetime
+
+import models
+from database import SessionLocal
+
+RATING_MAX = 10
+BAYES_PRIOR_MEAN = 7.0
+BAYES_PRIOR_WEIGHT = 10
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", "72"))
+TRENDING_EPSILON = 0.01
+DECAY_CHUNK_SIZE = 500
+
+
+def _decayed(score: float, since: datetime, now: datetime) -> float:
+    if not score or since is None:
+        return score or 0.0
+    hours = max((now - since).total_seconds(), 0) / 3600
+    return score * 0.5 ** (hours / TRENDING_HALF_LIFE_HOURS)
+
+
+def _refresh(dish: models.Dish):
+    if dish.review_count:
+        dish.rating = round(dish.rating_sum / dish.review_count, 1)
+        dish.bayes_score = (
+            (BAYES_PRIOR_MEAN * BAYES_PRIOR_WEIGHT + dish.rating_sum)
+            / (BAYES_PRIOR_WEIGHT + dish.review_count)
+        )
+    else:
+        dish.rating = 0.0
+        dish.bayes_score = 0.0
+
+
+def _shift_trending(dish: models.Dish, delta: float, now: datetime):
+    score = _decayed(dish.trending_score, dish.trending_updated_at, now) + delta
+    dish.trending_score = max(score, 0.0)
+    dish.trending_updated_at = now
+
+
+def apply_review(
+    dish: models.Dish,
+    rating: int,
+    old_rating: int = None,
+    old_created_at: datetime = None,
+    now: datetime = None,
+):
+    """Оновлює збережені оцінки страви після нового або зміненого відгуку.
+
+    Зміна відгуку прибирає згаслий на цей момент внесок старої оцінки
+    (від old_created_at) і додає нову як свіжу, бо created_at теж оновлюється.
+    """
+    now = now or datetime.utcnow()
+    if old_rating is None:
+        dish.review_count = (dish.review_count or 0) + 1
+        dish.rating_sum = (dish.rating_sum or 0) + rating
+        _shift_trending(dish, rating / RATING_MAX, now)
+    else:
+        dish.rating_sum = (dish.rating_sum or 0) + rating - old_rating
+        old_share = _decayed(old_rating / RATING_MAX, old_created_at, now)
+        _shift_trending(dish, rating / RATING_MAX - old_share, now)
+    _refresh(dish)
+
+
+def remove_review(dish: models.Dish, rating: int, created_at: datetime = None, now: datetime = None):
+    """Прибирає відгук з лічильників і його згаслий внесок у trending."""
+    now = now or datetime.utcnow()
+    dish.review_count = max((dish.review_count or 0) - 1, 0)
+    dish.rating_sum = (dish.rating_sum or 0) - rating if dish.review_count else 0
+    _shift_trending(dish, -_decayed(rating / RATING_MAX, created_at, now), now)
+    _refresh(dish)
+
+
+def decay_trending(db, now: datetime = None) -> int:
+    """Періодичний прохід: зводить trending усіх активних страв до поточного часу.
+
+    Обходить лише страви з trending_score > 0 (за індексом), порціями по id.
+    Рядки блокуються так само, як у add_review; зайняті зараз пропускаються
+    до наступного проходу.
+    """
+    now = now or datetime.utcnow()
+    last_id = 0
+    updated = 0
+    while True:
+        batch = (
+            db.query(models.Dish)
+            .filter(models.Dish.trending_score > 0, models.Dish.id > last_id)
+            .order_by(models.Dish.id)
+            .limit(DECAY_CHUNK_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not batch:
+            break
+        for dish in batch:
+            score = _decayed(dish.trending_score, dish.trending_updated_at, now)
+            dish.trending_score = score if score >= TRENDING_EPSILON else 0.0
+            dish.trending_updated_at = now
+        db.commit()
+        updated += len(batch)
+        last_id = batch[-1].id
+    return updated
+
+
+def rebuild(db, now: datetime = None):
+    """Перераховує всі збережені оцінки з таблиці відгуків (для міграції)."""
+    now = now or datetime.utcnow()
+    stats = {}
+    rows = db.query(models.Review.dish_id, models.Review.rating, models.Review.created_at).yield_per(1000)
+    for dish_id, rating, created_at in rows:
+        count, total, trending = stats.get(dish_id, (0, 0, 0.0))
+        stats[dish_id] = (count + 1, total + rating, trending + _decayed(rating / RATING_MAX, created_at, now))
+
+    for dish in db.query(models.Dish).all():
+        count, total, trending = stats.get(dish.id, (0, 0, 0.0))
+        dish.review_count = count
+        dish.rating_sum = total
+        dish.trending_score = trending if trending >= TRENDING_EPSILON else 0.0
+        dish.trending_updated_at = now
+        _refresh(dish)
+    db.commit()
+
+
+if __name__ == "__main__":
+    from invalidation import bus, CATALOG_CHANGED
+
+    db = SessionLocal()
+    count = decay_trending(db)
+    db.close()
+    bus.publish(CATALOG_CHANGED)
+    print(f"Оновлено trending для {count} страв.")
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Request, Depends, Form
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 
 from database import get_db
+from templating import templates
 import models
+import ranking
+from invalidation import bus, DISH_CHANGED
 from routers.profile_controler import get_current_user
 
 router = APIRouter(tags=["Comments & Reviews"])
-templates = Jinja2Templates(directory="templates")
 
 @router.get("/recipe/{dish_id}/review")
 async def review_page(request: Request, dish_id: int, db: Session = Depends(get_db)):
@@ -39,7 +40,7 @@ def add_review(
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
-    dish = db.query(models.Dish).filter(models.Dish.id == dish_id).first()
+    dish = db.query(models.Dish).filter(models.Dish.id == dish_id).with_for_update().first()
     if not dish:
         return RedirectResponse(url="/", status_code=303)
 
@@ -49,21 +50,24 @@ def add_review(
     ).first()
 
     if existing_review:
+        now = datetime.utcnow()
+        ranking.apply_review(
+            dish, rating,
+            old_rating=existing_review.rating,
+            old_created_at=existing_review.created_at,
+            now=now,
+        )
         existing_review.rating = rating
         existing_review.text = text
-        existing_review.created_at = datetime.utcnow()
+        existing_review.created_at = now
     else:
         new_review = models.Review(rating=rating, text=text, user_id=user.id, dish_id=dish.id)
         db.add(new_review)
+        ranking.apply_review(dish, rating)
 
     db.commit()
 
-    all_reviews = db.query(models.Review).filter(models.Review.dish_id == dish.id).all()
-    if all_reviews:
-        total_rating = sum(r.rating for r in all_reviews)
-        dish.rating = round(total_rating / len(all_reviews), 1)
-        db.commit()
-
+    bus.publish(DISH_CHANGED, dish.id)
     return RedirectResponse(url=f"/recipe/{dish_id}", status_code=303)
 
 @router.post("/review/delete/{review_id}")
@@ -76,19 +80,11 @@ def delete_review(request: Request, review_id: int, db: Session = Depends(get_db
 
     if review and review.user_id == user.id:
         dish_id = review.dish_id
+        dish = db.query(models.Dish).filter(models.Dish.id == dish_id).with_for_update().first()
+        ranking.remove_review(dish, review.rating, created_at=review.created_at)
         db.delete(review)
         db.commit()
-
-        all_reviews = db.query(models.Review).filter(models.Review.dish_id == dish_id).all()
-        dish = db.query(models.Dish).filter(models.Dish.id == dish_id).first()
-
-        if all_reviews:
-            total_rating = sum(r.rating for r in all_reviews)
-            dish.rating = round(total_rating / len(all_reviews), 1)
-        else:
-            dish.rating = 0.0
-
-        db.commit()
+        bus.publish(DISH_CHANGED, dish_id)
         return RedirectResponse(url=f"/recipe/{dish_id}", status_code=303)
 
     return RedirectResponse(url="/", status_code=303)
@@ -0,0 +1,35 @@
+import hmac
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import export
+
+router = APIRouter(tags=["Export"])
+
+EXPORT_TOKEN = os.environ.get("EXPORT_TOKEN")
+
+
+@router.get("/admin/export/{kind}")
+def export_data(
+    kind: str,
+    format: str = "jsonl",
+    since_id: int = 0,
+    since: datetime = None,
+    x_export_token: str = Header(None),
+):
+    if not EXPORT_TOKEN or not hmac.compare_digest(x_export_token or "", EXPORT_TOKEN):
+        return JSONResponse({"error": "forbidden"}, status_code=403)
+    if kind not in ("dishes", "reviews") or format not in export.FORMATS:
+        return JSONResponse({"error": "unknown export"}, status_code=404)
+    if kind == "dishes" and since is not None:
+        return JSONResponse({"error": "since is only supported for reviews, use since_id"}, status_code=400)
+
+    # Генератор відкриває власне з'єднання: сесія запиту закривається раніше, ніж закінчиться потік.
+    return StreamingResponse(
+        export.export_lines(kind, format, since_id, since),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+    )
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+
+from fastapi import APIRouter, Request, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from database import get_db
+import models
+import schemas
+from routers.profile_controler import get_current_user
+
+router = APIRouter(tags=["Meal Plan"])
+
+QUANTITY_RE = re.compile(r"\((\d+(?:[.,]\d+)?)\s*([^)]*)\)")
+UNIT_ALIASES = {
+    "кг": ("г", 1000),
+    "л": ("мл", 1000),
+    "зубчики": ("зубчик", 1),
+    "жовтки": ("жовток", 1),
+    "скибочки": ("скибочка", 1),
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_quantity(line: str):
+    """Повертає (кількість, одиниця) з рядка на кшталт "Яловичина (500г)" або None."""
+    match = QUANTITY_RE.search(line)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    unit = match.group(2).strip()
+    unit, factor = UNIT_ALIASES.get(unit, (unit, 1))
+    return amount * factor, unit
+
+
+def _split_tags(value: str) -> set:
+    return {t.strip() for t in (value or "").split(",") if t.strip()}
+
+
+def _format_amount(amount: float):
+    amount = round(amount, 1)
+    return int(amount) if amount.is_integer() else amount
+
+
+@router.post("/api/meal-plan")
+def meal_plan(plan: schemas.MealPlanRequest, request: Request, db: Session = Depends(get_db)):
+    user = get_current_user(request, db)
+    user_allergen_set = _split_tags(user.allergens) if user else set()
+
+    dish_ids = {item.dish_id for item in plan.items}
+    dishes = {
+        d.id: d
+        for d in db.query(
+            models.Dish.id,
+            models.Dish.name,
+            models.Dish.servings,
+            models.Dish.ingredients,
+            models.Dish.optional_ingredients,
+        ).filter(models.Dish.id.in_(dish_ids))
+    }
+
+    dish_ings = {}
+    for dish_id, is_optional, ing_id, ing_name, allergen_tags in (
+        db.query(
+            models.DishIngredient.dish_id,
+            models.DishIngredient.is_optional,
+            models.Ingredient.id,
+            models.Ingredient.name,
+            models.Ingredient.allergen_tags,
+        )
+        .join(models.Ingredient)
+        .filter(models.DishIngredient.dish_id.in_(dish_ids))
+    ):
+        dish_ings.setdefault(dish_id, []).append((is_optional, ing_id, ing_name, allergen_tags))
+
+    shopping = {}
+    planned = []
+    for item in plan.items:
+        dish = dishes.get(item.dish_id)
+        if not dish:
+            continue
+        scale = item.servings / (dish.servings or item.servings)
+        planned.append({"dish_id": dish.id, "name": dish.name, "servings": item.servings})
+
+        lines = [l.strip().lower() for l in dish.ingredients.split("\n") + (dish.optional_ingredients or "").split("\n")]
+        for is_optional, ing_id, ing_name, allergen_tags in dish_ings.get(dish.id, []):
+            entry = shopping.get((ing_id, bool(is_optional)))
+            if entry is None:
+                tags = _split_tags(allergen_tags)
+                entry = shopping[(ing_id, bool(is_optional))] = {
+                    "ingredient_id": ing_id,
+                    "name": ing_name,
+                    "optional": bool(is_optional),
+                    "amounts": {},
+                    "dishes": [],
+                    "allergens": sorted(tags),
+                    "danger": sorted(tags & user_allergen_set),
+                }
+            entry["dishes"].append(dish.id)
+
+            name_lower = ing_name.lower()
+            line = next((l for l in lines if name_lower in l), None)
+            quantity = parse_quantity(line) if line else None
+            if quantity:
+                amount, unit = quantity
+                entry["amounts"][unit] = entry["amounts"].get(unit, 0) + amount * scale
+
+    items = sorted(shopping.values(), key=lambda e: (e["optional"], e["name"]))
+    for entry in items:
+        entry["amounts"] = [{"amount": _format_amount(a), "unit": u} for u, a in entry["amounts"].items()]
+
+    return JSONResponse({
+        "dishes": planned,
+        "unknown_dish_ids": sorted(dish_ids - dishes.keys()),
+        "required": [e for e in items if not e["optional"]],
+        "optional": [e for e in items if e["optional"]],
+    })
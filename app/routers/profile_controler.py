@@ -1,30 +1,36 @@
 import os
 import uuid
+from functools import lru_cache
 
 from fastapi import APIRouter, Request, Depends, Form, UploadFile, File
-from fastapi.templating import Jinja2Templates
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 
 from database import get_db
+from templating import templates
 import models
+from invalidation import bus, USER_CHANGED
 
 router = APIRouter(tags=["Profile"])
-templates = Jinja2Templates(directory="templates")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 AVATARS_DIR = "static/images/avatars"
 ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
 
 
+@lru_cache(maxsize=None)
+def get_pwd_context() -> CryptContext:
+    """Створює контекст bcrypt при першому зверненні, а не під час імпорту."""
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 def hash_password(password: str) -> str:
     password = password[:72]
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_current_user(request: Request, db: Session):
@@ -115,6 +121,7 @@ def change_password(
         return templates.TemplateResponse("profile.html", {"request": request, "user": user, "error": "Мінімум 6 символів"})
     user.hashed_password = hash_password(new_password)
     db.commit()
+    bus.publish(USER_CHANGED, user.id)
     return templates.TemplateResponse("profile.html", {"request": request, "user": user, "message": "Пароль змінено!"})
 
 
@@ -169,6 +176,7 @@ async def edit_profile(
         user.avatar = f"images/avatars/{unique_filename}"
 
     db.commit()
+    bus.publish(USER_CHANGED, user.id)
     return templates.TemplateResponse("profile_edit.html", {
         "request": request, "user": user, "message": "Профіль успішно оновлено!"
     })
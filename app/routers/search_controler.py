@@ -1,15 +1,28 @@
+from urllib.parse import urlencode
+
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, exists, func, or_
 
 from database import get_db
+from templating import templates
 import models
 from routers.profile_controler import get_current_user
 
 router = APIRouter(tags=["Search & Recipes"])
-templates = Jinja2Templates(directory="templates")
+
+RANKED_ORDERS = {
+    "trending": models.Dish.trending_score,
+    "top": models.Dish.bayes_score,
+}
+RANKED_LIMIT = 50
+
+RANGE_FILTERS = {
+    "calories": models.Dish.calories,
+    "time": models.Dish.cooking_time,
+    "servings": models.Dish.servings,
+}
 
 
 @router.get("/api/ingredients")
@@ -28,75 +41,125 @@ async def get_ingredients(db: Session = Depends(get_db)):
     return JSONResponse([{"id": r.id, "name": r.name, "dish_count": r.dish_count} for r in rows])
 
 
+def _int_param(request: Request, name: str):
+    value = request.query_params.get(name, "").strip()
+    return int(value) if value.isdigit() else None
+
+
+def _split_tags(value: str) -> set:
+    return {t.strip() for t in (value or "").split(",") if t.strip()}
+
+
+def allergen_ingredients(db: Session, allergens: set) -> dict:
+    """Інгредієнти, теги яких перетинаються з алергенами користувача: {id: спільні теги}."""
+    rows = (
+        db.query(models.Ingredient.id, models.Ingredient.allergen_tags)
+        .filter(models.Ingredient.allergen_tags != "")
+    )
+    matched = {}
+    for ing_id, tags in rows:
+        common = _split_tags(tags) & allergens
+        if common:
+            matched[ing_id] = common
+    return matched
+
+
+def build_dishes_query(db: Session, q: str = None, ranges: dict = None, excluded_ing_ids: list = None):
+    """Фільтри головної сторінки, що виконуються в SQL: назва, діапазони та алергени.
+
+    Страву виключає лише алерген в обов'язковому інгредієнті; опційні
+    лише позначаються попередженням у home().
+    """
+    dishes_query = db.query(models.Dish)
+    if q:
+        dishes_query = dishes_query.filter(models.Dish.name.ilike(f"%{q}%"))
+    for key, (low, high) in (ranges or {}).items():
+        column = RANGE_FILTERS[key]
+        if low is not None:
+            dishes_query = dishes_query.filter(column >= low)
+        if high is not None:
+            dishes_query = dishes_query.filter(column <= high)
+    if excluded_ing_ids:
+        dishes_query = dishes_query.filter(~exists().where(
+            models.DishIngredient.dish_id == models.Dish.id,
+            models.DishIngredient.is_optional == 0,
+            models.DishIngredient.ingredient_id.in_(excluded_ing_ids),
+        ))
+    return dishes_query
+
+
 @router.get("/")
-async def home(request: Request, q: str = None, db: Session = Depends(get_db)):
+async def home(request: Request, q: str = None, order: str = None, db: Session = Depends(get_db)):
     user = get_current_user(request, db)
     selected_ing_ids = [int(v) for v in request.query_params.getlist("ing") if v.isdigit()]
+    ranges = {key: (_int_param(request, f"{key}_min"), _int_param(request, f"{key}_max")) for key in RANGE_FILTERS}
 
-    user_allergen_names = []
+    allergen_ings = {}
     if user and user.allergens:
-        user_allergen_names = [a.strip() for a in user.allergens.split(",") if a.strip()]
+        allergen_ings = allergen_ingredients(db, _split_tags(user.allergens))
 
-    dishes_query = db.query(models.Dish)
-    if q:
-        dishes_query = dishes_query.filter(models.Dish.name.ilike(f"%{q}%"))
+    dishes_query = build_dishes_query(db, q, ranges, list(allergen_ings))
+    if order not in RANKED_ORDERS:
+        order = None
+    if selected_ing_ids:
+        is_required = models.DishIngredient.is_optional == 0
+        dishes_query = dishes_query.filter(or_(
+            exists().where(
+                models.DishIngredient.dish_id == models.Dish.id,
+                is_required,
+                models.DishIngredient.ingredient_id.in_(selected_ing_ids),
+            ),
+            ~exists().where(models.DishIngredient.dish_id == models.Dish.id, is_required),
+        )).order_by(models.Dish.id)
+    elif order:
+        dishes_query = dishes_query.order_by(RANKED_ORDERS[order].desc(), models.Dish.id).limit(RANKED_LIMIT)
+    else:
+        dishes_query = dishes_query.order_by(models.Dish.rating.desc(), models.Dish.id)
     dishes = dishes_query.all()
 
-    all_di = db.query(models.DishIngredient).all()
-    dish_ing_map = {}
-    for di in all_di:
-        if di.dish_id not in dish_ing_map:
-            dish_ing_map[di.dish_id] = {"required": set(), "optional": set()}
-        if di.is_optional == 0:
-            dish_ing_map[di.dish_id]["required"].add(di.ingredient_id)
-        else:
-            dish_ing_map[di.dish_id]["optional"].add(di.ingredient_id)
-
-    ing_allergen_map = {}
-    if user_allergen_names:
-        for ing in db.query(models.Ingredient).all():
-            tags = {t.strip() for t in (ing.allergen_tags or "").split(",") if t.strip()}
-            ing_allergen_map[ing.id] = tags
-
+    # Обов'язкові інгредієнти (для сортування за ing) і опційні алергени (для попередження)
+    # беруться одним запитом по знайдених стравах, щоб "/" вкладався в бюджет запитів.
+    required_map = {}
     dish_allergen_warning = {}
-    if user_allergen_names:
-        user_allergen_set = set(user_allergen_names)
-        for dish in dishes:
-            ing_data = dish_ing_map.get(dish.id, {"required": set(), "optional": set()})
-            all_ids = ing_data["required"] | ing_data["optional"]
-            matched = set()
-            for iid in all_ids:
-                tags = ing_allergen_map.get(iid, set())
-                matched |= (tags & user_allergen_set)
-            if matched:
-                dish_allergen_warning[dish.id] = matched
+    if dishes and (selected_ing_ids or allergen_ings):
+        link_filters = []
+        if selected_ing_ids:
+            link_filters.append(models.DishIngredient.is_optional == 0)
+        if allergen_ings:
+            link_filters.append(and_(
+                models.DishIngredient.is_optional == 1,
+                models.DishIngredient.ingredient_id.in_(list(allergen_ings)),
+            ))
+        for dish_id, ing_id, is_optional in db.query(
+            models.DishIngredient.dish_id, models.DishIngredient.ingredient_id, models.DishIngredient.is_optional
+        ).filter(
+            models.DishIngredient.dish_id.in_([d.id for d in dishes]),
+            or_(*link_filters),
+        ):
+            if is_optional:
+                dish_allergen_warning.setdefault(dish_id, set()).update(allergen_ings[ing_id])
+            else:
+                required_map.setdefault(dish_id, set()).add(ing_id)
 
     if selected_ing_ids:
         selected_set = set(selected_ing_ids)
-
-        scored = []
-        for dish in dishes:
-            ing_data = dish_ing_map.get(dish.id, {"required": set(), "optional": set()})
-            required_ids = ing_data["required"]
-
-            if not required_ids:
-                scored.append((dish, 9999))
-                continue
-
-            have = required_ids & selected_set
-            missing = required_ids - selected_set
-            missing_count = len(missing)
-
-            if have:
-                scored.append((dish, missing_count))
-
+        scored = [
+            (dish, len(required_map[dish.id] - selected_set) if dish.id in required_map else 9999)
+            for dish in dishes
+        ]
         scored.sort(key=lambda x: x[1])
         dishes = [d for d, _ in scored]
         dish_missing = {d.id: m for d, m in scored}
     else:
-        dishes.sort(key=lambda d: d.rating, reverse=True)
         dish_missing = {}
 
+    filter_params = {"q": q} if q else {}
+    for key, (low, high) in ranges.items():
+        if low is not None:
+            filter_params[f"{key}_min"] = low
+        if high is not None:
+            filter_params[f"{key}_max"] = high
+
     all_ingredients = (
         db.query(
             models.Ingredient.id,
@@ -118,6 +181,10 @@ async def home(request: Request, q: str = None, db: Session = Depends(get_db)):
         "search_query": q,
         "all_ingredients": all_ingredients,
         "selected_ing_ids": selected_ing_ids,
+        "current_order": order,
+        "ranges": ranges,
+        "has_filters": bool(filter_params),
+        "filter_query": urlencode(filter_params),
     })
 
 
@@ -186,7 +253,11 @@ async def recipe_page(request: Request, dish_id: int, sort: str = "newest", db:
 
     steps_list = [s.strip() for s in dish.steps.split("\n") if s.strip()]
 
-    reviews_query = db.query(models.Review).filter(models.Review.dish_id == dish_id)
+    reviews_query = (
+        db.query(models.Review)
+        .options(joinedload(models.Review.author))
+        .filter(models.Review.dish_id == dish_id)
+    )
     if sort == "highest":
         reviews_query = reviews_query.order_by(models.Review.rating.desc())
     elif sort == "lowest":
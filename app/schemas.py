@@ -0,0 +1,12 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class MealPlanItem(BaseModel):
+    dish_id: int
+    servings: int = Field(..., gt=0, le=100)
+
+
+class MealPlanRequest(BaseModel):
+    items: List[MealPlanItem] = Field(..., min_length=1, max_length=100)
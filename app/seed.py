@@ -1,5 +1,6 @@
 from database import SessionLocal, engine
 import models
+from invalidation import bus, CATALOG_CHANGED
 
 models.Base.metadata.create_all(bind=engine)
 
@@ -193,6 +194,7 @@ def seed_data():
 
     db.commit()
     db.close()
+    bus.publish(CATALOG_CHANGED)
     print("Done!")
 
 
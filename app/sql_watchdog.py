@@ -0,0 +1,240 @@
+"""Опційний нагляд за SQL: журнал повільних запитів з EXPLAIN, бюджети запитів на маршрут
+та обрив завислих запитів.
+
+Лічильники запитів підключаються завжди (query_budget працює без налаштувань),
+решта вмикається змінними оточення:
+    SQL_WATCHDOG=1               журнал повільних запитів і бюджети маршрутів
+    SQL_WATCHDOG_STRICT=1        перевищення бюджету кидає QueryBudgetExceeded (для тестів)
+    SLOW_QUERY_MS=100            поріг повільного запиту
+    SQL_STATEMENT_TIMEOUT_MS=0   statement_timeout у Postgres / progress handler у SQLite
+
+Окремий запит може змінити таймаут опцією виконання sql_watchdog_timeout (мс, None — без
+обмеження), як-от потокове читання в export.py.
+"""
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get("SQL_WATCHDOG") == "1"
+STRICT = os.environ.get("SQL_WATCHDOG_STRICT") == "1"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+STATEMENT_TIMEOUT_MS = int(os.environ.get("SQL_STATEMENT_TIMEOUT_MS", "0"))
+
+# (макс. кількість запитів, макс. сумарний час SQL у мс) для шаблону шляху маршруту.
+DEFAULT_BUDGET = (
+    int(os.environ.get("SQL_BUDGET_QUERIES", "20")),
+    float(os.environ.get("SQL_BUDGET_MS", "500")),
+)
+ROUTE_BUDGETS = {
+    "/": (5, 200),
+    "/recipe/{dish_id}": (5, 100),
+    "/api/ingredients": (1, 50),
+    "/api/meal-plan": (3, 100),
+    "/admin/export/{kind}": (None, None),
+}
+
+SQLITE_PROGRESS_STEPS = 10000
+
+_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)s"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+_current = ContextVar("sql_watchdog_stats", default=None)
+_installed = False
+slow_queries = {}
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.seconds = 0.0
+
+    @property
+    def route(self):
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return route.path if route is not None else self.scope.get("path")
+
+
+def normalize(statement: str) -> str:
+    for pattern, replacement in _NORMALIZERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def check_budget(stats: QueryStats, budget=None, strict: bool = STRICT):
+    max_queries, max_ms = budget or ROUTE_BUDGETS.get(stats.route, DEFAULT_BUDGET)
+    problems = []
+    if max_queries is not None and stats.queries > max_queries:
+        problems.append(f"{stats.queries} запитів (бюджет {max_queries})")
+    if max_ms is not None and stats.seconds * 1000 > max_ms:
+        problems.append(f"{stats.seconds * 1000:.1f} мс SQL (бюджет {max_ms:g} мс)")
+    if not problems:
+        return
+    message = f"{stats.route or '-'}: " + ", ".join(problems)
+    if strict:
+        raise QueryBudgetExceeded(message)
+    logger.warning("Перевищено бюджет SQL %s", message)
+
+
+@contextmanager
+def query_budget(max_queries: int = None, max_ms: float = None):
+    """Рахує запити всередині блоку і кидає QueryBudgetExceeded при перевищенні."""
+    if not _installed:
+        raise RuntimeError("sql_watchdog.install(engine) не викликано — запити не рахуються")
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+    check_budget(stats, (max_queries, max_ms), strict=True)
+
+
+class WatchdogMiddleware:
+    """ASGI-middleware: збирає статистику SQL для кожного HTTP-запиту."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+        check_budget(stats)
+
+
+def _explain(cursor, dialect: str, statement: str, parameters):
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    explain_cursor = cursor.connection.cursor()
+    try:
+        if dialect == "postgresql":
+            explain_cursor.execute("SAVEPOINT sql_watchdog_explain")
+        try:
+            explain_cursor.execute(prefix + statement, parameters)
+            rows = explain_cursor.fetchall()
+        except Exception as exc:
+            if dialect == "postgresql":
+                explain_cursor.execute("ROLLBACK TO SAVEPOINT sql_watchdog_explain")
+            return f"EXPLAIN не вдався: {exc}"
+        if dialect == "postgresql":
+            explain_cursor.execute("RELEASE SAVEPOINT sql_watchdog_explain")
+        return "\n".join(str(row[-1]) for row in rows)
+    finally:
+        explain_cursor.close()
+
+
+def _statement_timeout(context):
+    if context is None or "sql_watchdog_timeout" not in context.execution_options:
+        return STATEMENT_TIMEOUT_MS, False
+    return context.execution_options["sql_watchdog_timeout"] or 0, True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    state = conn.info.setdefault("sql_watchdog", {})
+    state["start"] = time.perf_counter()
+    if STATEMENT_TIMEOUT_MS <= 0:
+        return
+    timeout_ms, overridden = _statement_timeout(context)
+    if conn.dialect.name != "sqlite":
+        if overridden:
+            # У Postgres таймаут діє на кожен FETCH серверного курсора окремо;
+            # SET LOCAL змінює його лише до кінця поточної транзакції.
+            set_cursor = cursor.connection.cursor()
+            set_cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            set_cursor.close()
+        return
+    if timeout_ms > 0:
+        # Дедлайн живе, поки курсор читає рядки: знімається лише наступним
+        # запитом, commit/rollback або поверненням з'єднання в пул.
+        state["deadline"] = state["start"] + timeout_ms / 1000
+    else:
+        state.pop("deadline", None)
+
+
+def _clear_deadline(conn):
+    conn.info.get("sql_watchdog", {}).pop("deadline", None)
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    connection_record.info.get("sql_watchdog", {}).pop("deadline", None)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    state = conn.info.get("sql_watchdog", {})
+    start = state.pop("start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+    if not ENABLED or elapsed * 1000 < SLOW_QUERY_MS:
+        return
+    key = normalize(statement)
+    seen = slow_queries.get(key)
+    slow_queries[key] = (seen or 0) + 1
+    if seen:
+        return
+    plan = "-"
+    if not executemany and statement.lstrip().upper().startswith("SELECT"):
+        plan = _explain(cursor, conn.dialect.name, statement, parameters)
+    logger.warning(
+        "Повільний запит %.1f мс, маршрут %s:\n%s\nПлан:\n%s",
+        elapsed * 1000, stats.route if stats else "-", key, plan,
+    )
+
+
+def _on_connect(dbapi_connection, connection_record):
+    if hasattr(dbapi_connection, "set_progress_handler"):
+        state = connection_record.info.setdefault("sql_watchdog", {})
+
+        def interrupt():
+            deadline = state.get("deadline")
+            return 1 if deadline is not None and time.perf_counter() > deadline else 0
+
+        dbapi_connection.set_progress_handler(interrupt, SQLITE_PROGRESS_STEPS)
+    else:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"SET statement_timeout = {STATEMENT_TIMEOUT_MS}")
+        cursor.close()
+        dbapi_connection.commit()
+
+
+def install(engine):
+    """Підключає лічильники запитів до engine; таймаути — лише якщо задано SQL_STATEMENT_TIMEOUT_MS."""
+    global _installed
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if STATEMENT_TIMEOUT_MS > 0:
+        event.listen(engine, "connect", _on_connect)
+        event.listen(engine, "commit", _clear_deadline)
+        event.listen(engine, "rollback", _clear_deadline)
+        event.listen(engine, "checkin", _on_checkin)
+    _installed = True
@@ -0,0 +1,60 @@
+import os
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIR = "templates"
+TEMPLATE_CACHE_DIR = os.environ.get("TEMPLATE_CACHE_DIR", ".jinja_cache")
+
+
+class _OptionalBytecodeCache(FileSystemBytecodeCache):
+    """Кеш байткоду, що створює теку при першому записі.
+
+    Якщо тека недоступна для запису, кеш вимикається і шаблони
+    компілюються лише в пам'яті.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self.enabled = None
+
+    def _writable(self) -> bool:
+        if self.enabled is None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self.enabled = os.access(self.directory, os.W_OK | os.X_OK)
+            except OSError:
+                self.enabled = False
+        return self.enabled
+
+    def load_bytecode(self, bucket):
+        if os.path.isdir(self.directory):
+            super().load_bytecode(bucket)
+
+    def dump_bytecode(self, bucket):
+        if not self._writable():
+            return
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            self.enabled = False
+
+
+def _create_env() -> Environment:
+    """Одне спільне середовище Jinja для всіх роутерів з кешем байткоду на диску."""
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        bytecode_cache=_OptionalBytecodeCache(TEMPLATE_CACHE_DIR),
+    )
+
+
+templates = Jinja2Templates(env=_create_env())
+
+
+def precompile_templates() -> int:
+    """Компілює всі шаблони наперед, щоб воркер стартував з теплим кешем."""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="recipes-tests-")
+
+# Налаштування читаються під час імпорту модулів застосунку, тож задаються до нього.
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ["SQL_WATCHDOG"] = "1"
+os.environ["SQL_WATCHDOG_STRICT"] = "1"
+os.environ["CACHE_BUS_TRANSPORT"] = "none"
+os.environ["TEMPLATE_CACHE_DIR"] = os.path.join(TMP_DIR, "jinja")
+
+# static/ і templates/ підключаються відносними шляхами.
+os.chdir(APP_DIR)
+sys.path.insert(0, APP_DIR)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    import models
+    from database import engine
+    from seed import seed_data
+
+    models.Base.metadata.create_all(bind=engine)
+    seed_data()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def allergic_client(client):
+    client.post("/register", data={"username": "allergic", "password": "secret1", "password2": "secret1"})
+    client.post("/login", data={"username": "allergic", "password": "secret1"})
+    client.post("/profile/edit", data={"username": "allergic", "allergens": "Свинина, Молоко"})
+    return client
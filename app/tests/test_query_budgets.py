@@ -0,0 +1,49 @@
+"""Маршрути мають вкладатися в ROUTE_BUDGETS: у strict-режимі перевищення — це 500."""
+import pytest
+
+PAGES = ["/", "/?ing=1", "/?ing=1&ing=2", "/?order=top", "/?order=trending", "/?calories_max=500", "/recipe/1"]
+MEAL_PLAN = {"items": [{"dish_id": 1, "servings": 4}, {"dish_id": 3, "servings": 2}]}
+
+
+@pytest.mark.parametrize("url", PAGES)
+def test_pages_anonymous(client, url):
+    assert client.get(url).status_code == 200
+
+
+@pytest.mark.parametrize("url", PAGES)
+def test_pages_with_allergens(allergic_client, url):
+    assert allergic_client.get(url).status_code == 200
+
+
+def test_allergen_warning_shown(allergic_client):
+    assert "dish-card__badge--allergen" in allergic_client.get("/").text
+
+
+def test_meal_plan_anonymous(client):
+    response = client.post("/api/meal-plan", json=MEAL_PLAN)
+    assert response.status_code == 200
+    assert len(response.json()["dishes"]) == 2
+
+
+def test_meal_plan_with_allergens(allergic_client):
+    response = allergic_client.post("/api/meal-plan", json=MEAL_PLAN)
+    assert response.status_code == 200
+    assert any(item["danger"] for item in response.json()["required"] + response.json()["optional"])
+
+
+def test_query_budget_counts_queries(app):
+    import models
+    import sql_watchdog
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        with sql_watchdog.query_budget(max_queries=1) as stats:
+            db.query(models.Dish).first()
+        assert stats.queries == 1
+        with pytest.raises(sql_watchdog.QueryBudgetExceeded):
+            with sql_watchdog.query_budget(max_queries=1):
+                db.query(models.Dish).first()
+                db.query(models.Ingredient).first()
+    finally:
+        db.close()